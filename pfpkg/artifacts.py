@@ -12,7 +12,7 @@ from pfpkg.util_time import utc_now_iso
 
 def put_artifact(conn, repo_root: Path, *, kind: str, path_value: str) -> dict:
     abs_path = path_to_repo_relative(repo_root, path_value)
-    if not abs_path.exists() or not abs_path.is_file():
+    if not abs_path.is_file():
         raise PfError(f"artifact file not found: {path_value}", EXIT_NOT_FOUND)
 
     rel_path = str(abs_path.relative_to(repo_root))
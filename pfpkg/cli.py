@@ -2,17 +2,15 @@
 
 from __future__ import annotations
 
-import argparse
 import json
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
 from pfpkg.artifacts import put_artifact
-from pfpkg.context_builder import build_context_bundle
 from pfpkg.db import db_session, is_initialized
 from pfpkg.doctor import run_doctor
-from pfpkg.docs_freshness import check_docs, mark_doc_fixed, scan_docs
 from pfpkg.errors import (
     EXIT_IO,
     EXIT_OK,
@@ -27,210 +25,23 @@ from pfpkg.missions import close_mission, create_mission
 from pfpkg.modules import detect_modules, get_module, init_module, list_modules, upsert_module
 from pfpkg.output import CommandResult, print_human, print_json_only
 from pfpkg.paths import PFPaths, find_repo_root
-from pfpkg.pkm import list_pkm, refresh_pkm_staleness, upsert_pkm_from_args
 from pfpkg.plans import approve_plan, create_slice, mark_plan_saved, validate_slices
 from pfpkg.report import build_manager_report, render_manager_report_human
 from pfpkg.replay import replay_check
 from pfpkg.status import build_status, render_status_human
 from pfpkg.tasks import set_task_state, create_task
+from pfpkg.util_hash import save_sha256_cache, set_sha256_cache_path
 from pfpkg.worktrees import list_worktrees, upsert_worktree
 
 
 VALID_INTENTS = {"plan", "execute", "review", "retro", "status"}
 
 
-class PFArgumentParser(argparse.ArgumentParser):
-    """Argument parser that never writes usage text during normal command flow."""
-
-    def error(self, message: str) -> None:  # pragma: no cover - tested via CLI behavior
-        raise PfError(message, EXIT_USAGE)
-
-
 def _extract_json_flag(argv: list[str]) -> tuple[list[str], bool]:
     clean = [x for x in argv if x != "--json"]
     return clean, len(clean) != len(argv)
 
 
-def _parser() -> argparse.ArgumentParser:
-    p = PFArgumentParser(prog="pf")
-    sub = p.add_subparsers(dest="command")
-
-    sub.add_parser("init")
-    sub.add_parser("status")
-
-    # focus
-    p_focus = sub.add_parser("focus")
-    sub_focus = p_focus.add_subparsers(dest="focus_cmd")
-    p_focus_module = sub_focus.add_parser("module")
-    p_focus_module.add_argument("module_id")
-
-    # event
-    p_event = sub.add_parser("event")
-    sub_event = p_event.add_subparsers(dest="event_cmd")
-    p_event_append = sub_event.add_parser("append")
-    p_event_append.add_argument("--type", required=True)
-    p_event_append.add_argument("--scope-type", required=True)
-    p_event_append.add_argument("--scope-id", required=True)
-    p_event_append.add_argument("--summary", required=True)
-    p_event_append.add_argument("--actor", default="assistant")
-    p_event_append.add_argument("--payload-json")
-    p_event_append.add_argument("--payload")
-    p_event_append.add_argument("--artifact-ids")
-    p_event_append.add_argument("--mission-id")
-    p_event_append.add_argument("--task-id")
-    p_event_append.add_argument("--slice-id")
-    p_event_append.add_argument("--worktree-id")
-
-    p_event_tail = sub_event.add_parser("tail")
-    p_event_tail.add_argument("--scope-type")
-    p_event_tail.add_argument("--scope-id")
-    p_event_tail.add_argument("--mission-id")
-    p_event_tail.add_argument("--limit", type=int, default=20)
-
-    # artifact
-    p_artifact = sub.add_parser("artifact")
-    sub_artifact = p_artifact.add_subparsers(dest="artifact_cmd")
-    p_artifact_put = sub_artifact.add_parser("put")
-    p_artifact_put.add_argument("--kind", required=True)
-    p_artifact_put.add_argument("--path", required=True)
-
-    # module
-    p_module = sub.add_parser("module")
-    sub_module = p_module.add_subparsers(dest="module_cmd")
-    sub_module.add_parser("detect")
-    p_module_upsert = sub_module.add_parser("upsert")
-    p_module_upsert.add_argument("--module-id", required=True)
-    p_module_upsert.add_argument("--root-path", required=True)
-    p_module_upsert.add_argument("--display-name", required=True)
-    sub_module.add_parser("list")
-    p_module_show = sub_module.add_parser("show")
-    p_module_show.add_argument("--module-id", required=True)
-    p_module_init = sub_module.add_parser("init")
-    p_module_init.add_argument("--module-id", required=True)
-    p_module_init.add_argument("--write-scaffold", action="store_true")
-
-    # worktree
-    p_worktree = sub.add_parser("worktree")
-    sub_worktree = p_worktree.add_subparsers(dest="worktree_cmd")
-    p_worktree_upsert = sub_worktree.add_parser("upsert")
-    p_worktree_upsert.add_argument("--worktree-id", required=True)
-    p_worktree_upsert.add_argument("--module-id", required=True)
-    p_worktree_upsert.add_argument("--path", required=True)
-    p_worktree_upsert.add_argument("--branch")
-
-    p_worktree_register = sub_worktree.add_parser("register")
-    p_worktree_register.add_argument("--worktree-id")
-    p_worktree_register.add_argument("--module-id", required=True)
-    p_worktree_register.add_argument("--path", required=True)
-    p_worktree_register.add_argument("--branch")
-
-    p_worktree_list = sub_worktree.add_parser("list")
-    p_worktree_list.add_argument("--module-id")
-
-    # mission
-    p_mission = sub.add_parser("mission")
-    sub_mission = p_mission.add_subparsers(dest="mission_cmd")
-    p_mission_create = sub_mission.add_parser("create")
-    p_mission_create.add_argument("--title", required=True)
-    p_mission_create.add_argument("--summary")
-    p_mission_create.add_argument("--spec-path")
-    p_mission_close = sub_mission.add_parser("close")
-    p_mission_close.add_argument("--mission-id", required=True)
-    p_mission_close.add_argument("--summary", required=True)
-
-    # task
-    p_task = sub.add_parser("task")
-    sub_task = p_task.add_subparsers(dest="task_cmd")
-    p_task_create = sub_task.add_parser("create")
-    p_task_create.add_argument("--module-id", required=True)
-    p_task_create.add_argument("--title", required=True)
-    p_task_create.add_argument("--mission-id")
-    p_task_state = sub_task.add_parser("set-state")
-    p_task_state.add_argument("--task-id", required=True)
-    p_task_state.add_argument("--state", required=True)
-
-    # plan
-    p_plan = sub.add_parser("plan")
-    sub_plan = p_plan.add_subparsers(dest="plan_cmd")
-    p_plan_saved = sub_plan.add_parser("mark-saved")
-    p_plan_saved.add_argument("--module-id", required=True)
-    p_plan_saved.add_argument("--task-id")
-    p_plan_approve = sub_plan.add_parser("approve")
-    p_plan_approve.add_argument("--module-id", required=True)
-    p_plan_approve.add_argument("--task-id")
-    p_plan_approve.add_argument("--note", required=True)
-
-    # slice
-    p_slice = sub.add_parser("slice")
-    sub_slice = p_slice.add_subparsers(dest="slice_cmd")
-    p_slice_create = sub_slice.add_parser("create")
-    p_slice_create.add_argument("--task-id", required=True)
-    p_slice_create.add_argument("--title", required=True)
-    p_slice_create.add_argument("--allowed-paths", default="")
-    p_slice_create.add_argument("--verify", default="")
-
-    # slices
-    p_slices = sub.add_parser("slices")
-    sub_slices = p_slices.add_subparsers(dest="slices_cmd")
-    p_slices_validate = sub_slices.add_parser("validate")
-    p_slices_validate.add_argument("--module-id", required=True)
-
-    # docs
-    p_docs = sub.add_parser("docs")
-    sub_docs = p_docs.add_subparsers(dest="docs_cmd")
-    p_docs_scan = sub_docs.add_parser("scan")
-    p_docs_scan.add_argument("--scope", choices=["root", "module"])
-    p_docs_scan.add_argument("--module-id")
-    p_docs_check = sub_docs.add_parser("check")
-    p_docs_check.add_argument("--scope", choices=["root", "module"])
-    p_docs_check.add_argument("--module-id")
-    p_docs_mark = sub_docs.add_parser("mark-fixed")
-    p_docs_mark.add_argument("--path", required=True)
-    p_docs_mark.add_argument("--reason")
-
-    # pkm
-    p_pkm = sub.add_parser("pkm")
-    sub_pkm = p_pkm.add_subparsers(dest="pkm_cmd")
-    p_pkm_upsert = sub_pkm.add_parser("upsert")
-    p_pkm_upsert.add_argument("--scope-type", required=True)
-    p_pkm_upsert.add_argument("--scope-id", required=True)
-    p_pkm_upsert.add_argument("--kind", required=True)
-    p_pkm_upsert.add_argument("--title", required=True)
-    p_pkm_upsert.add_argument("--body-md", required=True)
-    p_pkm_upsert.add_argument("--fingerprint-json", required=True)
-    p_pkm_upsert.add_argument("--confidence", type=float, required=True)
-    p_pkm_upsert.add_argument("--tags")
-
-    p_pkm_list = sub_pkm.add_parser("list")
-    p_pkm_list.add_argument("--scope-type", required=True)
-    p_pkm_list.add_argument("--scope-id", required=True)
-    p_pkm_list.add_argument("--kind")
-
-    # context
-    p_context = sub.add_parser("context")
-    sub_context = p_context.add_subparsers(dest="context_cmd")
-    p_context_build = sub_context.add_parser("build")
-    p_context_build.add_argument("--intent", required=True)
-    p_context_build.add_argument("--module")
-    p_context_build.add_argument("--task")
-    p_context_build.add_argument("--budget", type=int, default=12000)
-    p_context_build.add_argument("--query")
-
-    # replay
-    p_replay = sub.add_parser("replay")
-    p_replay.add_argument("--check", action="store_true")
-
-    # doctor
-    sub.add_parser("doctor")
-
-    # report
-    p_report = sub.add_parser("report")
-    sub_report = p_report.add_subparsers(dest="report_cmd")
-    sub_report.add_parser("manager")
-
-    return p
-
-
 def _result_for_status(conn, paths: PFPaths) -> CommandResult:
     status_data = build_status(conn, paths.pf_db_path)
     return CommandResult(
@@ -244,19 +55,8 @@ def _result_for_status(conn, paths: PFPaths) -> CommandResult:
 def _dispatch(args, paths: PFPaths) -> CommandResult:
     if args.command in (None, "status"):
         if not is_initialized(paths.pf_db_path):
-            status_data = {
-                "initialized": False,
-                "active_mission": None,
-                "focus": {"module_id": None, "task_id": None, "worktree_id": None},
-                "modules": [],
-                "incidents": [],
-                "stale_docs_count": 0,
-                "next": {
-                    "kind": "cli",
-                    "cmd": "pf init",
-                    "why": "initialize PowerFlow in this repo",
-                },
-            }
+            # build_status answers the uninitialized case without touching the db.
+            status_data = build_status(None, paths.pf_db_path)
             return CommandResult(
                 command="status",
                 data={"state": status_data},
@@ -507,6 +307,8 @@ def _dispatch(args, paths: PFPaths) -> CommandResult:
             return CommandResult(command="slices validate", data=payload, human_lines=lines)
 
         if args.command == "docs" and args.docs_cmd == "scan":
+            from pfpkg.docs_freshness import scan_docs
+
             payload = scan_docs(conn, paths.repo_root, scope=args.scope, module_id=args.module_id)
             return CommandResult(
                 command="docs scan",
@@ -515,6 +317,8 @@ def _dispatch(args, paths: PFPaths) -> CommandResult:
             )
 
         if args.command == "docs" and args.docs_cmd == "check":
+            from pfpkg.docs_freshness import check_docs
+
             payload = check_docs(conn, paths.repo_root, scope=args.scope, module_id=args.module_id)
             return CommandResult(
                 command="docs check",
@@ -523,6 +327,8 @@ def _dispatch(args, paths: PFPaths) -> CommandResult:
             )
 
         if args.command == "docs" and args.docs_cmd == "mark-fixed":
+            from pfpkg.docs_freshness import mark_doc_fixed
+
             payload = mark_doc_fixed(conn, paths.repo_root, path=args.path, reason=args.reason)
             return CommandResult(
                 command="docs mark-fixed",
@@ -531,10 +337,14 @@ def _dispatch(args, paths: PFPaths) -> CommandResult:
             )
 
         if args.command == "pkm" and args.pkm_cmd == "upsert":
+            from pfpkg.pkm import upsert_pkm_from_args
+
             payload = upsert_pkm_from_args(conn, args)
             return CommandResult(command="pkm upsert", data=payload, human_lines=[f"PKM OK: id={payload['pkm_id']} {payload['title']}"])
 
         if args.command == "pkm" and args.pkm_cmd == "list":
+            from pfpkg.pkm import list_pkm, refresh_pkm_staleness
+
             refresh_pkm_staleness(conn, paths.repo_root)
             items = list_pkm(conn, scope_type=args.scope_type, scope_id=args.scope_id, kind=args.kind)
             lines = ["PKM items:"]
@@ -545,6 +355,8 @@ def _dispatch(args, paths: PFPaths) -> CommandResult:
         if args.command == "context" and args.context_cmd == "build":
             if args.intent not in VALID_INTENTS:
                 raise PfError("intent must be one of plan|execute|review|retro|status", EXIT_VALIDATION)
+            from pfpkg.context_builder import build_context_bundle
+
             payload = build_context_bundle(
                 conn,
                 paths.repo_root,
@@ -591,13 +403,20 @@ def main(argv: list[str] | None = None) -> int:
     cleaned_argv, json_mode = _extract_json_flag(raw_argv)
 
     try:
-        parser = _parser()
-        args = parser.parse_args(cleaned_argv)
+        if cleaned_argv in ([], ["status"]):
+            args = SimpleNamespace(command="status")
+        else:
+            from pfpkg.cli_parser import build_parser
+
+            args = build_parser(cleaned_argv[0] if cleaned_argv else None).parse_args(cleaned_argv)
 
         repo_root = find_repo_root(Path.cwd())
         paths = PFPaths(repo_root=repo_root)
 
+        set_sha256_cache_path(paths.sha256_cache_path)
         result = _dispatch(args, paths)
+        if paths.pf_dir.is_dir():
+            save_sha256_cache(paths.sha256_cache_path)
 
         if json_mode:
             print_json_only(result.as_json())
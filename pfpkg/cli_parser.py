@@ -0,0 +1,251 @@
+"""Argument parser for the pf CLI."""
+
+from __future__ import annotations
+
+import argparse
+from functools import lru_cache
+
+from pfpkg.errors import EXIT_USAGE, PfError
+
+_DOC_SCOPES = ("root", "module")
+
+
+class PFArgumentParser(argparse.ArgumentParser):
+    """Argument parser that never writes usage text during normal command flow."""
+
+    def error(self, message: str) -> None:  # pragma: no cover - tested via CLI behavior
+        raise PfError(message, EXIT_USAGE)
+
+
+def _add_init_parser(sub) -> None:
+    sub.add_parser("init")
+
+
+def _add_status_parser(sub) -> None:
+    sub.add_parser("status")
+
+
+def _add_focus_parser(sub) -> None:
+    p_focus = sub.add_parser("focus")
+    sub_focus = p_focus.add_subparsers(dest="focus_cmd")
+    p_focus_module = sub_focus.add_parser("module")
+    p_focus_module.add_argument("module_id")
+
+
+def _add_event_parser(sub) -> None:
+    p_event = sub.add_parser("event")
+    sub_event = p_event.add_subparsers(dest="event_cmd")
+    p_event_append = sub_event.add_parser("append")
+    p_event_append.add_argument("--type", required=True)
+    p_event_append.add_argument("--scope-type", required=True)
+    p_event_append.add_argument("--scope-id", required=True)
+    p_event_append.add_argument("--summary", required=True)
+    p_event_append.add_argument("--actor", default="assistant")
+    p_event_append.add_argument("--payload-json")
+    p_event_append.add_argument("--payload")
+    p_event_append.add_argument("--artifact-ids")
+    p_event_append.add_argument("--mission-id")
+    p_event_append.add_argument("--task-id")
+    p_event_append.add_argument("--slice-id")
+    p_event_append.add_argument("--worktree-id")
+
+    p_event_tail = sub_event.add_parser("tail")
+    p_event_tail.add_argument("--scope-type")
+    p_event_tail.add_argument("--scope-id")
+    p_event_tail.add_argument("--mission-id")
+    p_event_tail.add_argument("--limit", type=int, default=20)
+
+
+def _add_artifact_parser(sub) -> None:
+    p_artifact = sub.add_parser("artifact")
+    sub_artifact = p_artifact.add_subparsers(dest="artifact_cmd")
+    p_artifact_put = sub_artifact.add_parser("put")
+    p_artifact_put.add_argument("--kind", required=True)
+    p_artifact_put.add_argument("--path", required=True)
+
+
+def _add_module_parser(sub) -> None:
+    p_module = sub.add_parser("module")
+    sub_module = p_module.add_subparsers(dest="module_cmd")
+    sub_module.add_parser("detect")
+    p_module_upsert = sub_module.add_parser("upsert")
+    p_module_upsert.add_argument("--module-id", required=True)
+    p_module_upsert.add_argument("--root-path", required=True)
+    p_module_upsert.add_argument("--display-name", required=True)
+    sub_module.add_parser("list")
+    p_module_show = sub_module.add_parser("show")
+    p_module_show.add_argument("--module-id", required=True)
+    p_module_init = sub_module.add_parser("init")
+    p_module_init.add_argument("--module-id", required=True)
+    p_module_init.add_argument("--write-scaffold", action="store_true")
+
+
+def _add_worktree_parser(sub) -> None:
+    p_worktree = sub.add_parser("worktree")
+    sub_worktree = p_worktree.add_subparsers(dest="worktree_cmd")
+    p_worktree_upsert = sub_worktree.add_parser("upsert")
+    p_worktree_upsert.add_argument("--worktree-id", required=True)
+    p_worktree_upsert.add_argument("--module-id", required=True)
+    p_worktree_upsert.add_argument("--path", required=True)
+    p_worktree_upsert.add_argument("--branch")
+
+    p_worktree_register = sub_worktree.add_parser("register")
+    p_worktree_register.add_argument("--worktree-id")
+    p_worktree_register.add_argument("--module-id", required=True)
+    p_worktree_register.add_argument("--path", required=True)
+    p_worktree_register.add_argument("--branch")
+
+    p_worktree_list = sub_worktree.add_parser("list")
+    p_worktree_list.add_argument("--module-id")
+
+
+def _add_mission_parser(sub) -> None:
+    p_mission = sub.add_parser("mission")
+    sub_mission = p_mission.add_subparsers(dest="mission_cmd")
+    p_mission_create = sub_mission.add_parser("create")
+    p_mission_create.add_argument("--title", required=True)
+    p_mission_create.add_argument("--summary")
+    p_mission_create.add_argument("--spec-path")
+    p_mission_close = sub_mission.add_parser("close")
+    p_mission_close.add_argument("--mission-id", required=True)
+    p_mission_close.add_argument("--summary", required=True)
+
+
+def _add_task_parser(sub) -> None:
+    p_task = sub.add_parser("task")
+    sub_task = p_task.add_subparsers(dest="task_cmd")
+    p_task_create = sub_task.add_parser("create")
+    p_task_create.add_argument("--module-id", required=True)
+    p_task_create.add_argument("--title", required=True)
+    p_task_create.add_argument("--mission-id")
+    p_task_state = sub_task.add_parser("set-state")
+    p_task_state.add_argument("--task-id", required=True)
+    p_task_state.add_argument("--state", required=True)
+
+
+def _add_plan_parser(sub) -> None:
+    p_plan = sub.add_parser("plan")
+    sub_plan = p_plan.add_subparsers(dest="plan_cmd")
+    p_plan_saved = sub_plan.add_parser("mark-saved")
+    p_plan_saved.add_argument("--module-id", required=True)
+    p_plan_saved.add_argument("--task-id")
+    p_plan_approve = sub_plan.add_parser("approve")
+    p_plan_approve.add_argument("--module-id", required=True)
+    p_plan_approve.add_argument("--task-id")
+    p_plan_approve.add_argument("--note", required=True)
+
+
+def _add_slice_parser(sub) -> None:
+    p_slice = sub.add_parser("slice")
+    sub_slice = p_slice.add_subparsers(dest="slice_cmd")
+    p_slice_create = sub_slice.add_parser("create")
+    p_slice_create.add_argument("--task-id", required=True)
+    p_slice_create.add_argument("--title", required=True)
+    p_slice_create.add_argument("--allowed-paths", default="")
+    p_slice_create.add_argument("--verify", default="")
+
+
+def _add_slices_parser(sub) -> None:
+    p_slices = sub.add_parser("slices")
+    sub_slices = p_slices.add_subparsers(dest="slices_cmd")
+    p_slices_validate = sub_slices.add_parser("validate")
+    p_slices_validate.add_argument("--module-id", required=True)
+
+
+def _add_docs_parser(sub) -> None:
+    p_docs = sub.add_parser("docs")
+    sub_docs = p_docs.add_subparsers(dest="docs_cmd")
+    p_docs_scan = sub_docs.add_parser("scan")
+    p_docs_scan.add_argument("--scope", choices=_DOC_SCOPES)
+    p_docs_scan.add_argument("--module-id")
+    p_docs_check = sub_docs.add_parser("check")
+    p_docs_check.add_argument("--scope", choices=_DOC_SCOPES)
+    p_docs_check.add_argument("--module-id")
+    p_docs_mark = sub_docs.add_parser("mark-fixed")
+    p_docs_mark.add_argument("--path", required=True)
+    p_docs_mark.add_argument("--reason")
+
+
+def _add_pkm_parser(sub) -> None:
+    p_pkm = sub.add_parser("pkm")
+    sub_pkm = p_pkm.add_subparsers(dest="pkm_cmd")
+    p_pkm_upsert = sub_pkm.add_parser("upsert")
+    p_pkm_upsert.add_argument("--scope-type", required=True)
+    p_pkm_upsert.add_argument("--scope-id", required=True)
+    p_pkm_upsert.add_argument("--kind", required=True)
+    p_pkm_upsert.add_argument("--title", required=True)
+    p_pkm_upsert.add_argument("--body-md", required=True)
+    p_pkm_upsert.add_argument("--fingerprint-json", required=True)
+    p_pkm_upsert.add_argument("--confidence", type=float, required=True)
+    p_pkm_upsert.add_argument("--tags")
+
+    p_pkm_list = sub_pkm.add_parser("list")
+    p_pkm_list.add_argument("--scope-type", required=True)
+    p_pkm_list.add_argument("--scope-id", required=True)
+    p_pkm_list.add_argument("--kind")
+
+
+def _add_context_parser(sub) -> None:
+    p_context = sub.add_parser("context")
+    sub_context = p_context.add_subparsers(dest="context_cmd")
+    p_context_build = sub_context.add_parser("build")
+    p_context_build.add_argument("--intent", required=True)
+    p_context_build.add_argument("--module")
+    p_context_build.add_argument("--task")
+    p_context_build.add_argument("--budget", type=int, default=12000)
+    p_context_build.add_argument("--query")
+
+
+def _add_replay_parser(sub) -> None:
+    p_replay = sub.add_parser("replay")
+    p_replay.add_argument("--check", action="store_true")
+
+
+def _add_doctor_parser(sub) -> None:
+    sub.add_parser("doctor")
+
+
+def _add_report_parser(sub) -> None:
+    p_report = sub.add_parser("report")
+    sub_report = p_report.add_subparsers(dest="report_cmd")
+    sub_report.add_parser("manager")
+
+
+_COMMAND_PARSERS = {
+    "init": _add_init_parser,
+    "status": _add_status_parser,
+    "focus": _add_focus_parser,
+    "event": _add_event_parser,
+    "artifact": _add_artifact_parser,
+    "module": _add_module_parser,
+    "worktree": _add_worktree_parser,
+    "mission": _add_mission_parser,
+    "task": _add_task_parser,
+    "plan": _add_plan_parser,
+    "slice": _add_slice_parser,
+    "slices": _add_slices_parser,
+    "docs": _add_docs_parser,
+    "pkm": _add_pkm_parser,
+    "context": _add_context_parser,
+    "replay": _add_replay_parser,
+    "doctor": _add_doctor_parser,
+    "report": _add_report_parser,
+}
+
+
+def build_parser(command: str | None = None) -> argparse.ArgumentParser:
+    # Unknown commands share the full parser so the cache stays bounded.
+    return _build_parser(command if command in _COMMAND_PARSERS else None)
+
+
+@lru_cache(maxsize=None)
+def _build_parser(command: str | None) -> argparse.ArgumentParser:
+    p = PFArgumentParser(prog="pf")
+    sub = p.add_subparsers(dest="command")
+    if command is not None:
+        _COMMAND_PARSERS[command](sub)
+    else:
+        # Help, unknown commands and bare `pf` need the full command list.
+        for add_parser in _COMMAND_PARSERS.values():
+            add_parser(sub)
+    return p
@@ -5,9 +5,12 @@ from __future__ import annotations
 import json
 import re
 import shutil
+import stat
 import subprocess
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from pfpkg.artifacts import put_artifact
 from pfpkg.docs_freshness import check_docs
@@ -21,8 +24,14 @@ from pfpkg.util_hash import sha256_file
 from pfpkg.util_time import utc_now_iso
 from pfpkg.validation import ensure_safe_module_id_or_raise, validate_module_id_strict
 
+_QUERY_TOKEN_RE = re.compile(r"[A-Za-z0-9_./-]{3,}")
+_DOC_FILE_TOKEN_RE = re.compile(r"[A-Za-z0-9_./-]+\.[A-Za-z0-9]+")
+_RG_LINE_RE = re.compile(r"^(.+?):(\d+):(.*)$")
+_RG_MAX_PER_FILE = 60
+_RG_MAX_HITS = 200
 
-def _resolve_scope(conn, module: str | None) -> tuple[dict[str, str], Path]:
+
+def _resolve_scope(conn, module: str | None, focus: dict[str, Any]) -> tuple[dict[str, str], Path]:
     if module:
         module = validate_module_id_strict(module)
         cur = conn.execute("SELECT module_id, root_path FROM modules WHERE module_id=?", (module,))
@@ -32,7 +41,6 @@ def _resolve_scope(conn, module: str | None) -> tuple[dict[str, str], Path]:
         safe_module_id = ensure_safe_module_id_or_raise(row["module_id"], source="modules table")
         return {"type": "module", "id": safe_module_id}, Path(row["root_path"])
 
-    focus = get_focus(conn)
     if focus.get("module_id"):
         cur = conn.execute("SELECT module_id, root_path FROM modules WHERE module_id=?", (focus["module_id"],))
         row = cur.fetchone()
@@ -43,10 +51,9 @@ def _resolve_scope(conn, module: str | None) -> tuple[dict[str, str], Path]:
     return {"type": "root", "id": "root"}, Path(".")
 
 
-def _task_id_from_args_or_focus(conn, task: str | None) -> str | None:
+def _task_id_from_args_or_focus(task: str | None, focus: dict[str, Any]) -> str | None:
     if task:
         return task
-    focus = get_focus(conn)
     return focus.get("task_id")
 
 
@@ -76,6 +83,7 @@ def _resolve_allowed_roots(
     if not isinstance(slices, list):
         return default
 
+    module_root_str = str(module_root)
     resolved: list[Path] = []
     for entry in slices:
         if not isinstance(entry, dict):
@@ -92,20 +100,23 @@ def _resolve_allowed_roots(
             if not candidate:
                 continue
             if "<module_root>" in candidate:
-                candidate = candidate.replace("<module_root>", str(module_root))
+                candidate = candidate.replace("<module_root>", module_root_str)
             try:
                 abs_path = path_to_repo_relative(repo_root, candidate)
             except PfError:
                 continue
-            if abs_path.exists() and abs_path.is_dir():
-                resolved.append(Path(abs_path.relative_to(repo_root)))
-            elif abs_path.exists() and abs_path.is_file():
-                resolved.append(Path(abs_path.relative_to(repo_root)).parent)
+            rel_path = Path(abs_path.relative_to(repo_root))
+            try:
+                mode = abs_path.stat().st_mode
+            except OSError:
+                mode = 0
+            if stat.S_ISREG(mode):
+                resolved.append(rel_path.parent)
             else:
-                # Keep deterministic behavior and allow pre-created targets.
-                resolved.append(Path(abs_path.relative_to(repo_root)))
+                # Directories, and missing paths (kept so pre-created targets stay deterministic).
+                resolved.append(rel_path)
 
-    unique = sorted(set(resolved), key=lambda p: str(p))
+    unique = sorted(set(resolved), key=str)
     return unique or default
 
 
@@ -128,14 +139,18 @@ def _select_documents(repo_root: Path, scope: dict[str, str], task_id: str | Non
     selected: list[dict[str, Any]] = []
     for kind, rel_path in docs:
         path = repo_root / rel_path
-        if not path.exists() or not path.is_file():
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        if not stat.S_ISREG(st.st_mode):
             continue
         selected.append(
             {
                 "kind": kind,
                 "path": rel_path,
                 "sha256": sha256_file(path),
-                "bytes": path.stat().st_size,
+                "bytes": st.st_size,
             }
         )
     return selected
@@ -216,25 +231,24 @@ def _select_pkm(conn, scope: dict[str, str], *, limit_module: int = 5, limit_glo
     return selected
 
 
-def _extract_patterns(query: str | None, docs: list[dict[str, Any]], repo_root: Path) -> list[str]:
-    patterns: list[str] = []
-
+def _pattern_candidates(query: str | None, docs: list[dict[str, Any]], repo_root: Path) -> Iterator[str]:
     if query:
-        for token in re.findall(r"[A-Za-z0-9_./-]{3,}", query):
-            patterns.append(token)
+        yield from _QUERY_TOKEN_RE.findall(query)
 
+    # Tokens never span lines, so scanning line by line finds the same ones.
     for item in docs:
-        path = repo_root / item["path"]
         try:
-            text = path.read_text(encoding="utf-8")
+            with (repo_root / item["path"]).open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    yield from _DOC_FILE_TOKEN_RE.findall(line)
         except Exception:
             continue
-        for token in re.findall(r"[A-Za-z0-9_./-]+\.[A-Za-z0-9]+", text):
-            patterns.append(token)
 
+
+def _extract_patterns(query: str | None, docs: list[dict[str, Any]], repo_root: Path) -> list[str]:
     seen: set[str] = set()
     unique: list[str] = []
-    for token in patterns:
+    for token in _pattern_candidates(query, docs, repo_root):
         if token in seen:
             continue
         seen.add(token)
@@ -244,51 +258,93 @@ def _extract_patterns(query: str | None, docs: list[dict[str, Any]], repo_root:
     return unique
 
 
+@lru_cache(maxsize=1)
+def _rg_available() -> bool:
+    return shutil.which("rg") is not None
+
+
+def _rg_root_hits(
+    repo_root: Path,
+    abs_root: Path,
+    patterns: list[str],
+    rel_by_raw_path: dict[str, str | None],
+    limit: int,
+) -> list[list[tuple[str, int, str]]] | None:
+    # One rg run per root with every pattern; each printed line is then credited
+    # to the patterns it matches, as if rg had been run once per pattern. The
+    # tokens only use [A-Za-z0-9_./-], which re and rg interpret identically.
+    compiled = [re.compile(pat) for pat in patterns]
+    cmd = ["rg", "-n", "--with-filename", "--no-heading", "--color", "never"]
+    for pat in patterns:
+        cmd.extend(["-e", pat])
+    cmd.extend(["--", str(abs_root)])
+    per_pattern: list[list[tuple[str, int, str]]] = [[] for _ in patterns]
+    per_file_counts: dict[tuple[str, int], int] = {}
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=repo_root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except OSError:
+        return None
+    killed = False
+    with proc:
+        for raw in proc.stdout:
+            m = _RG_LINE_RE.match(raw.rstrip("\n"))
+            if not m:
+                continue
+            raw_path, text = m.group(1), m.group(3)
+            if raw_path not in rel_by_raw_path:
+                try:
+                    rel_by_raw_path[raw_path] = str(Path(raw_path).resolve().relative_to(repo_root))
+                except ValueError:
+                    rel_by_raw_path[raw_path] = None
+            rel = rel_by_raw_path[raw_path]
+            if rel is None:
+                continue
+            for idx, regex in enumerate(compiled):
+                if len(per_pattern[idx]) >= limit or not regex.search(text):
+                    continue
+                count = per_file_counts.get((raw_path, idx), 0)
+                if count >= _RG_MAX_PER_FILE:
+                    continue
+                per_file_counts[(raw_path, idx)] = count + 1
+                per_pattern[idx].append((rel, int(m.group(2)), text))
+            # The first pattern's hits are taken before any others, so once they
+            # fill the limit nothing else from this root can be selected.
+            if len(per_pattern[0]) >= limit:
+                proc.kill()
+                killed = True
+                break
+    if not killed and proc.returncode not in (0, 1):
+        return None
+    return per_pattern
+
+
 def _rg_hits(repo_root: Path, allowed_roots: list[Path], patterns: list[str]) -> list[tuple[str, int, str]]:
     if not patterns:
         return []
-    if shutil.which("rg") is None:
+    if not _rg_available():
         return []
 
     hits: list[tuple[str, int, str]] = []
-    abs_allowed_roots = [(repo_root / root).resolve() for root in allowed_roots]
-    for abs_allowed in abs_allowed_roots:
-        for pat in patterns:
-            cmd = [
-                "rg",
-                "-n",
-                "--no-heading",
-                "--color",
-                "never",
-                "--max-count",
-                "60",
-                "-e",
-                pat,
-                str(abs_allowed),
-            ]
-            proc = subprocess.run(
-                cmd,
-                cwd=repo_root,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=False,
-            )
-            if proc.returncode not in (0, 1):
-                continue
-            for raw in proc.stdout.splitlines():
-                m = re.match(r"^(.+?):(\d+):(.*)$", raw)
-                if not m:
-                    continue
-                path = Path(m.group(1)).resolve()
-                try:
-                    rel = str(path.relative_to(repo_root))
-                except ValueError:
-                    continue
-                line_no = int(m.group(2))
-                text = m.group(3)
-                hits.append((rel, line_no, text))
-                if len(hits) >= 200:
+    rel_by_raw_path: dict[str, str | None] = {}
+    for root in allowed_roots:
+        abs_allowed = (repo_root / root).resolve()
+        if not abs_allowed.exists():
+            continue
+        per_pattern = _rg_root_hits(repo_root, abs_allowed, patterns, rel_by_raw_path, _RG_MAX_HITS - len(hits))
+        if per_pattern is None:
+            continue
+        # Roots, then patterns in order, until _RG_MAX_HITS: lines matching several
+        # patterns count once per pattern, which weights them in snippet ranking.
+        for pattern_hits in per_pattern:
+            for hit in pattern_hits:
+                hits.append(hit)
+                if len(hits) >= _RG_MAX_HITS:
                     return sorted(hits)
     return sorted(hits)
 
@@ -303,10 +359,12 @@ def _snippets_from_hits(repo_root: Path, hits: list[tuple[str, int, str]], max_f
     snippets: list[dict[str, Any]] = []
     for rel, line_numbers in ranked:
         abs_path = repo_root / rel
-        if not abs_path.exists() or not abs_path.is_file():
+        if not abs_path.is_file():
             continue
-        lines = abs_path.read_text(encoding="utf-8", errors="ignore").splitlines()
-        for target in sorted(set(line_numbers))[:windows_per_file]:
+        targets = sorted(set(line_numbers))[:windows_per_file]
+        with abs_path.open("r", encoding="utf-8", errors="ignore") as fh:
+            lines = [line.rstrip("\n") for line in islice(fh, targets[-1] + window)]
+        for target in targets:
             start = max(1, target - window)
             end = min(len(lines), target + window)
             content = "\n".join(lines[start - 1 : end])
@@ -340,8 +398,14 @@ def _bundle_size(selected: dict[str, Any]) -> int:
 
 
 def _enforce_budget(selected: dict[str, Any], budget: int) -> None:
-    while _bundle_size(selected) > budget and selected["code_snippets"]:
-        selected["code_snippets"].pop()
+    # Track the size incrementally while trimming snippets instead of re-serializing
+    # the whole bundle per pop: dropping a trailing list item removes its own JSON
+    # plus the ", " separator (none when it was the only item).
+    size = _bundle_size(selected)
+    snippets = selected["code_snippets"]
+    while size > budget and snippets:
+        removed = snippets.pop()
+        size -= _bundle_size(removed) + (2 if snippets else 0)
     while _bundle_size(selected) > budget and len(selected["events"]) > 10:
         selected["events"] = selected["events"][:10]
     while _bundle_size(selected) > budget and len(selected["pkm"]) > 3:
@@ -419,10 +483,12 @@ def build_context_bundle(
     budget: int,
     query: str | None,
 ) -> dict:
-    refresh_pkm_staleness(conn, repo_root)
+    # Resolve (and validate) the scope before any fingerprint hashing.
+    focus = get_focus(conn)
+    scope, module_root = _resolve_scope(conn, module, focus)
+    task_id = _task_id_from_args_or_focus(task, focus)
 
-    scope, module_root = _resolve_scope(conn, module)
-    task_id = _task_id_from_args_or_focus(conn, task)
+    refresh_pkm_staleness(conn, repo_root)
     allowed_roots = _resolve_allowed_roots(
         repo_root,
         module_root,
@@ -437,6 +503,20 @@ def build_context_bundle(
         check_docs(conn, repo_root)
 
     documents = _select_documents(repo_root, scope, task_id)
+    freshness = _freshness_for_scope(conn, scope)
+
+    # The minimum depends only on documents + freshness: reject a too-small
+    # budget before running the event/PKM queries and the rg snippet search.
+    min_required_budget = _bundle_size(
+        _min_required_selected({"documents": documents, "freshness": freshness})
+    )
+    if budget < min_required_budget:
+        raise PfError(
+            f"budget too small: minimum required is {min_required_budget} bytes",
+            EXIT_VALIDATION,
+            details={"min_required_budget": min_required_budget},
+        )
+
     events = _recent_events(conn, scope)
     pkm = _select_pkm(conn, scope)
 
@@ -449,16 +529,8 @@ def build_context_bundle(
         "pkm": pkm,
         "events": events,
         "code_snippets": snippets,
-        "freshness": _freshness_for_scope(conn, scope),
+        "freshness": freshness,
     }
-
-    min_required_budget = _bundle_size(_min_required_selected(selected))
-    if budget < min_required_budget:
-        raise PfError(
-            f"budget too small: minimum required is {min_required_budget} bytes",
-            EXIT_VALIDATION,
-            details={"min_required_budget": min_required_budget},
-        )
     _enforce_budget(selected, budget)
     if _bundle_size(selected) > budget:
         raise PfError(
@@ -149,6 +149,8 @@ def connect_db(db_path: Path) -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys=ON;")
     conn.execute("PRAGMA journal_mode=WAL;")
+    # WAL stays consistent with NORMAL; fsync happens at checkpoints, not per commit.
+    conn.execute("PRAGMA synchronous=NORMAL;")
     return conn
 
 
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -11,20 +13,30 @@ from pfpkg.errors import PfError
 from pfpkg.events import append_event
 from pfpkg.util_hash import sha256_bytes, sha256_file
 from pfpkg.util_time import utc_now_iso
-from pfpkg.util_git import git_tree_hash
-
-
-def _extract_front_matter(text: str) -> str | None:
-    if not text.startswith("---\n"):
-        return None
-    end = text.find("\n---", 4)
-    if end == -1:
-        return None
-    return text[4:end]
-
-
-def parse_pf_doc_frontmatter(text: str) -> dict[str, Any] | None:
-    fm = _extract_front_matter(text)
+from pfpkg.util_git import git_dirty_paths, git_head_trees, path_escapes_repo
+
+_PF_DOC_KEY_RE = re.compile(r"^\s*pf_doc:\s*$")
+_SCOPE_RE = re.compile(r"^\s*scope:\s*(.+?)\s*$")
+_SOURCE_PATH_RE = re.compile(r"^\s*-\s*path:\s*(.+?)\s*$")
+_SOURCE_MODE_RE = re.compile(r"^\s*mode:\s*(.+?)\s*$")
+
+
+def _read_front_matter(path: Path) -> str | None:
+    """Return the text between the leading ``---`` fences, reading only that far."""
+    with path.open("r", encoding="utf-8") as fh:
+        if fh.readline() != "---\n":
+            return None
+        block: list[str] = []
+        for line in fh:
+            # The opening fence's newline cannot close the block, so the first
+            # body line is always content even when it starts with '---'.
+            if block and line.startswith("---"):
+                return "".join(block)[:-1]
+            block.append(line)
+    return None
+
+
+def _parse_front_matter_block(fm: str | None) -> dict[str, Any] | None:
     if fm is None or "pf_doc:" not in fm:
         return None
 
@@ -39,24 +51,24 @@ def parse_pf_doc_frontmatter(text: str) -> dict[str, Any] | None:
         if not line.strip():
             continue
 
-        if re.match(r"^\s*pf_doc:\s*$", line):
+        if _PF_DOC_KEY_RE.match(line):
             in_pf = True
             continue
         if not in_pf:
             continue
 
-        scope_m = re.match(r"^\s*scope:\s*(.+?)\s*$", line)
+        scope_m = _SCOPE_RE.match(line)
         if scope_m:
             scope = scope_m.group(1).strip()
             continue
 
-        src_m = re.match(r"^\s*-\s*path:\s*(.+?)\s*$", line)
+        src_m = _SOURCE_PATH_RE.match(line)
         if src_m:
             current = {"path": src_m.group(1).strip()}
             sources.append(current)
             continue
 
-        mode_m = re.match(r"^\s*mode:\s*(.+?)\s*$", line)
+        mode_m = _SOURCE_MODE_RE.match(line)
         if mode_m and current is not None:
             current["mode"] = mode_m.group(1).strip()
             continue
@@ -67,25 +79,44 @@ def parse_pf_doc_frontmatter(text: str) -> dict[str, Any] | None:
     return {"scope": scope, "sources": sources}
 
 
-def _compute_source(repo_root: Path, source: dict[str, str]) -> dict[str, Any]:
+def _compute_source(
+    repo_root: Path,
+    source: dict[str, str],
+    head_trees: dict[str, str | None],
+    dirty_paths: set[str],
+) -> dict[str, Any]:
     path = source["path"]
     mode = source.get("mode", "file-sha")
 
     if mode == "file-sha":
         abs_path = (repo_root / path).resolve()
-        if abs_path.exists() and abs_path.is_file():
+        if abs_path.is_file():
             return {"path": path, "mode": mode, "sha256": sha256_file(abs_path)}
         return {"path": path, "mode": mode, "sha256": "missing"}
 
     if mode == "git-tree":
-        tree, dirty = git_tree_hash(repo_root, path)
-        return {"path": path, "mode": mode, "tree": tree or "missing", "dirty": dirty}
+        tree = head_trees.get(path)
+        return {"path": path, "mode": mode, "tree": tree or "missing", "dirty": path in dirty_paths}
 
     return {"path": path, "mode": mode, "error": "unsupported_mode"}
 
 
-def compute_fingerprint(repo_root: Path, sources: list[dict[str, str]]) -> dict[str, Any]:
-    normalized = [_compute_source(repo_root, src) for src in sources]
+def _git_tree_state(repo_root: Path, sources_list: list[list[dict[str, str]]]) -> tuple[dict[str, str | None], set[str]]:
+    paths = sorted({src["path"] for sources in sources_list for src in sources if src.get("mode") == "git-tree"})
+    # git rejects paths outside the repo; they never resolve, so keep them out of the batch.
+    in_repo = [p for p in paths if not path_escapes_repo(p)]
+    head_trees: dict[str, str | None] = dict.fromkeys(paths)
+    head_trees.update(git_head_trees(repo_root, in_repo))
+    return head_trees, git_dirty_paths(repo_root, in_repo)
+
+
+def _fingerprint(
+    repo_root: Path,
+    sources: list[dict[str, str]],
+    head_trees: dict[str, str | None],
+    dirty_paths: set[str],
+) -> dict[str, Any]:
+    normalized = [_compute_source(repo_root, src, head_trees, dirty_paths) for src in sources]
     norm_sorted = sorted(normalized, key=lambda x: (x.get("path", ""), x.get("mode", "")))
     blob = json.dumps(norm_sorted, sort_keys=True, ensure_ascii=False).encode("utf-8")
     return {
@@ -95,25 +126,46 @@ def compute_fingerprint(repo_root: Path, sources: list[dict[str, str]]) -> dict[
     }
 
 
+def compute_fingerprint(repo_root: Path, sources: list[dict[str, str]]) -> dict[str, Any]:
+    return _fingerprint(repo_root, sources, *_git_tree_state(repo_root, [sources]))
+
+
+def compute_fingerprints(repo_root: Path, sources_list: list[list[dict[str, str]]]) -> list[dict[str, Any]]:
+    head_trees, dirty_paths = _git_tree_state(repo_root, sources_list)
+    if len(sources_list) < 2:
+        return [_fingerprint(repo_root, sources, head_trees, dirty_paths) for sources in sources_list]
+    with ThreadPoolExecutor(max_workers=min(8, len(sources_list))) as pool:
+        return list(pool.map(lambda sources: _fingerprint(repo_root, sources, head_trees, dirty_paths), sources_list))
+
+
+def _md_files_under(root: Path) -> list[Path]:
+    # os.walk yields nothing for a missing root.
+    found: list[Path] = []
+    for dirpath, _, filenames in os.walk(root):
+        found.extend(Path(dirpath, name) for name in filenames if name.endswith(".md"))
+    return found
+
+
 def _find_doc_candidates(repo_root: Path, scope: str | None = None, module_id: str | None = None) -> list[Path]:
     candidates: list[Path] = []
 
     if scope in (None, "module"):
         modules_root = repo_root / ".pf" / "modules"
-        if modules_root.exists():
-            module_dirs = [modules_root / module_id] if module_id else sorted([p for p in modules_root.iterdir() if p.is_dir()])
-            for mod_dir in module_dirs:
-                docs_dir = mod_dir / "DOCS"
-                if not docs_dir.exists():
-                    continue
-                candidates.extend(sorted(docs_dir.glob("**/*.md")))
+        if module_id:
+            module_dirs = [modules_root / module_id]
+        else:
+            try:
+                with os.scandir(modules_root) as entries:
+                    module_dirs = [Path(entry.path) for entry in entries if entry.is_dir()]
+            except OSError:
+                module_dirs = []
+        for mod_dir in module_dirs:
+            candidates.extend(_md_files_under(mod_dir / "DOCS"))
 
     if scope in (None, "root"):
-        root_docs = repo_root / ".pf" / "DOCS"
-        if root_docs.exists():
-            candidates.extend(sorted(root_docs.glob("**/*.md")))
+        candidates.extend(_md_files_under(repo_root / ".pf" / "DOCS"))
 
-    return sorted(set(candidates), key=lambda p: str(p))
+    return sorted(set(candidates), key=str)
 
 
 def _scope_from_meta(meta_scope: str) -> tuple[str, str]:
@@ -127,16 +179,18 @@ def _scope_from_meta(meta_scope: str) -> tuple[str, str]:
 def scan_docs(conn, repo_root: Path, *, scope: str | None = None, module_id: str | None = None) -> dict:
     docs = _find_doc_candidates(repo_root, scope=scope, module_id=module_id)
     scanned: list[str] = []
+    now = utc_now_iso()
 
+    parsed = []
     for path in docs:
-        text = path.read_text(encoding="utf-8")
-        meta = parse_pf_doc_frontmatter(text)
-        if meta is None:
-            continue
+        meta = _parse_front_matter_block(_read_front_matter(path))
+        if meta is not None:
+            parsed.append((path, meta))
+    fingerprints = compute_fingerprints(repo_root, [meta["sources"] for _, meta in parsed])
+
+    for (path, meta), fingerprint in zip(parsed, fingerprints):
         scope_type, scope_id = _scope_from_meta(meta["scope"])
         rel_path = str(path.relative_to(repo_root))
-        fingerprint = compute_fingerprint(repo_root, meta["sources"])
-        now = utc_now_iso()
 
         cur = conn.execute(
             """
@@ -215,14 +269,14 @@ def check_docs(conn, repo_root: Path, *, scope: str | None = None, module_id: st
         tuple(params),
     )
 
+    rows = cur.fetchall()
+    currents = compute_fingerprints(repo_root, [json.loads(row["sources_json"]) for row in rows])
     checked = 0
-    for row in cur.fetchall():
+    now = utc_now_iso()
+    for row, current in zip(rows, currents):
         checked += 1
-        sources = json.loads(row["sources_json"])
-        current = compute_fingerprint(repo_root, sources)
         baseline_json = row["baseline_fingerprint_json"] or row["fingerprint_json"]
         baseline = json.loads(baseline_json)
-        now = utc_now_iso()
         current_json = json.dumps(current, ensure_ascii=False, sort_keys=True)
 
         if current.get("combined") != baseline.get("combined"):
@@ -291,6 +345,7 @@ def mark_doc_fixed(conn, repo_root: Path, *, path: str, reason: str | None = Non
         raise PfError(f"doc not indexed: {path}")
 
     fingerprint = compute_fingerprint(repo_root, json.loads(row["sources_json"]))
+    fingerprint_json = json.dumps(fingerprint, ensure_ascii=False, sort_keys=True)
     now = utc_now_iso()
     conn.execute(
         """
@@ -304,9 +359,9 @@ def mark_doc_fixed(conn, repo_root: Path, *, path: str, reason: str | None = Non
         WHERE doc_id=?
         """,
         (
-            json.dumps(fingerprint, ensure_ascii=False, sort_keys=True),
-            json.dumps(fingerprint, ensure_ascii=False, sort_keys=True),
-            json.dumps(fingerprint, ensure_ascii=False, sort_keys=True),
+            fingerprint_json,
+            fingerprint_json,
+            fingerprint_json,
             now,
             row["doc_id"],
         ),
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 from pfpkg.db import connect_db, require_initialized
@@ -12,12 +13,23 @@ from pfpkg.util_time import utc_now_iso
 def _collect_guardrail_files(repo_root: Path) -> list[tuple[str, str]]:
     out: list[tuple[str, str]] = []
     for root_name in ("scripts", "tools"):
-        root = repo_root / root_name
-        if not root.exists() or not root.is_dir():
-            continue
-        for file_path in sorted(root.rglob("*")):
-            if file_path.is_file():
-                out.append((str(file_path.relative_to(repo_root)), root_name))
+        files: list[str] = []
+        stack: list[tuple[str, str]] = [(str(repo_root / root_name), root_name)]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        rel = f"{rel_dir}/{entry.name}"
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, rel))
+                        elif entry.is_file():
+                            files.append(rel)
+            except OSError:
+                continue
+        # Same order as sorting the Paths rglob produced: component by component.
+        files.sort(key=lambda rel: rel.split("/"))
+        out.extend((rel, root_name) for rel in files)
     return out
 
 
@@ -66,9 +78,9 @@ def run_doctor(repo_root: Path, db_path: Path) -> dict:
 
     missing_skills = []
     for rel in SKILL_REL_PATHS:
-        path = repo_root / ".agents" / rel
-        if not path.exists():
-            missing_skills.append(str(path.relative_to(repo_root)))
+        rel_path = f".agents/{rel}"
+        if not (repo_root / rel_path).exists():
+            missing_skills.append(rel_path)
     checks.append(
         {
             "name": "skills_pack",
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 from pfpkg.errors import EXIT_NOT_FOUND, EXIT_VALIDATION, PfError
@@ -99,17 +100,16 @@ def list_modules(conn) -> list[dict]:
 def detect_modules(repo_root: Path) -> list[dict]:
     candidates: list[dict] = []
     for prefix in ("services", "apps", "packages"):
-        base = repo_root / prefix
-        if not base.exists() or not base.is_dir():
+        try:
+            with os.scandir(repo_root / prefix) as entries:
+                names = sorted(e.name for e in entries if e.is_dir() and not e.name.startswith("."))
+        except OSError:
             continue
-        for child in sorted(base.iterdir(), key=lambda p: p.name):
-            if not child.is_dir() or child.name.startswith("."):
-                continue
-            rel = str(child.relative_to(repo_root))
+        for name in names:
             candidates.append(
                 {
-                    "module_id": sanitize_module_id(child.name),
-                    "root_path": rel,
+                    "module_id": sanitize_module_id(name),
+                    "root_path": f"{prefix}/{name}",
                     "reason": f"top-level candidate under {prefix}/",
                 }
             )
@@ -208,7 +208,8 @@ def init_module(conn, repo_root: Path, *, module_id: str, write_scaffold: bool)
     )
 
     return {
-        "module": get_module(conn, module_id),
+        # Same row get_module would re-read after the UPDATE above.
+        "module": {**module, "initialized": 1, "updated_ts": now},
         "created_files": created_files,
         "created_dirs": created_dirs,
     }
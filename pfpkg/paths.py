@@ -48,6 +48,14 @@ class PFPaths:
     def local_dir(self) -> Path:
         return self.pf_dir / "local"
 
+    @property
+    def cache_dir(self) -> Path:
+        return self.pf_dir / "cache"
+
+    @property
+    def sha256_cache_path(self) -> Path:
+        return self.cache_dir / "sha256.json"
+
 
 def find_repo_root(cwd: Path | None = None) -> Path:
     current = (cwd or Path.cwd()).resolve()
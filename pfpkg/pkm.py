@@ -6,7 +6,7 @@ import json
 from pathlib import Path
 from typing import Any
 
-from pfpkg.docs_freshness import compute_fingerprint
+from pfpkg.docs_freshness import compute_fingerprints
 from pfpkg.errors import EXIT_VALIDATION, PfError
 from pfpkg.events import append_event
 from pfpkg.util_json import load_json_object_from_ref
@@ -142,8 +142,19 @@ def list_pkm(conn, *, scope_type: str, scope_id: str, kind: str | None = None) -
 
 
 def refresh_pkm_staleness(conn, repo_root: Path) -> int:
-    cur = conn.execute("SELECT pkm_id, fingerprint_json, stale FROM pkm_items")
+    # Items without a non-empty sources array can never go stale; skip them in SQL.
+    cur = conn.execute(
+        """
+        SELECT pkm_id, fingerprint_json, stale
+        FROM pkm_items
+        WHERE json_type(fingerprint_json, '$.sources') = 'array'
+          AND json_array_length(fingerprint_json, '$.sources') > 0
+        """
+    )
     changed = 0
+    now = utc_now_iso()
+    pending: list[tuple[Any, dict[str, Any], tuple[tuple[str, str], ...]]] = []
+    specs_by_key: dict[tuple[tuple[str, str], ...], list[dict[str, str]]] = {}
     for row in cur.fetchall():
         fp = json.loads(row["fingerprint_json"])
         sources = fp.get("sources")
@@ -158,13 +169,19 @@ def refresh_pkm_staleness(conn, repo_root: Path) -> int:
         if not source_specs:
             continue
 
-        recomputed = compute_fingerprint(repo_root, source_specs)
-        is_stale = 1 if recomputed.get("combined") != fp.get("combined") else 0
+        key = tuple((spec["path"], spec["mode"]) for spec in source_specs)
+        specs_by_key.setdefault(key, source_specs)
+        pending.append((row, fp, key))
+
+    fingerprints = compute_fingerprints(repo_root, list(specs_by_key.values()))
+    combined_by_sources = {key: fingerprint.get("combined") for key, fingerprint in zip(specs_by_key, fingerprints)}
+    for row, fp, key in pending:
+        is_stale = 1 if combined_by_sources[key] != fp.get("combined") else 0
         if is_stale != int(row["stale"]):
             changed += 1
             conn.execute(
                 "UPDATE pkm_items SET stale=?, updated_ts=? WHERE pkm_id=?",
-                (is_stale, utc_now_iso(), row["pkm_id"]),
+                (is_stale, now, row["pkm_id"]),
             )
     return changed
 
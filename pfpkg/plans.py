@@ -11,11 +11,12 @@ from pfpkg.errors import EXIT_NOT_FOUND, EXIT_VALIDATION, PfError
 from pfpkg.events import append_event
 from pfpkg.ids import next_slice_id
 from pfpkg.templates_store import load_template
+from pfpkg.util_fs import atomic_write_text
 from pfpkg.validation import ensure_safe_module_id_or_raise, validate_module_id_strict
 
 
 def _module_exists(conn, module_id: str) -> None:
-    ensure_safe_module_id_or_raise(module_id, source="plan command module_id")
+    # Callers pass an id already checked by validate_module_id_strict.
     cur = conn.execute("SELECT 1 FROM modules WHERE module_id=?", (module_id,))
     if cur.fetchone() is None:
         raise PfError(f"module not found: {module_id}", EXIT_NOT_FOUND)
@@ -128,9 +129,9 @@ def approve_plan(conn, *, module_id: str, task_id: str | None = None, note: str
     return {"event_id": event_id, "module_id": module_id, "task_id": task_id}
 
 
-def _load_slices(path: Path, template_text: str) -> dict[str, Any]:
+def _load_slices(repo_root: Path, path: Path) -> dict[str, Any]:
     if not path.exists():
-        return json.loads(template_text)
+        return json.loads(load_template(repo_root, "SLICES.json.template"))
     try:
         data = json.loads(path.read_text(encoding="utf-8"))
     except json.JSONDecodeError as exc:
@@ -162,8 +163,7 @@ def create_slice(
 
     rel = f".pf/modules/{module_id}/SLICES.json"
     path = repo_root / rel
-    template = load_template(repo_root, "SLICES.json.template")
-    payload = _load_slices(path, template)
+    payload = _load_slices(repo_root, path)
 
     slice_id = next_slice_id(conn)
     entry = {
@@ -178,7 +178,7 @@ def create_slice(
     payload["slices"].append(entry)
     payload["slices"] = sorted(payload["slices"], key=lambda x: x["slice_id"])
 
-    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    atomic_write_text(path, json.dumps(payload, indent=2, ensure_ascii=False) + "\n")
 
     append_event(
         conn,
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 from typing import Any
 
 
@@ -10,33 +11,33 @@ def initialized(db_path) -> bool:
 
 
 def active_mission(conn) -> dict[str, Any] | None:
+    # Newest mission whose latest mission.created has no later mission.closed.
     cur = conn.execute(
         """
-        SELECT mission_id, type, summary, ts, event_id
-        FROM events
-        WHERE mission_id IS NOT NULL
-          AND type IN ('mission.created', 'mission.closed')
-        ORDER BY event_id ASC
+        SELECT c.mission_id, c.summary, c.ts, c.event_id
+        FROM events c
+        WHERE c.type='mission.created'
+          AND c.mission_id IS NOT NULL
+          AND NOT EXISTS (
+            SELECT 1 FROM events x
+            WHERE x.mission_id=c.mission_id
+              AND x.type IN ('mission.created', 'mission.closed')
+              AND x.event_id > c.event_id
+          )
+        ORDER BY c.event_id DESC
+        LIMIT 1
         """
     )
-    state: dict[str, dict[str, Any]] = {}
-    for row in cur.fetchall():
-        mid = row["mission_id"]
-        if row["type"] == "mission.created":
-            state[mid] = {
-                "mission_id": mid,
-                "summary": row["summary"],
-                "created_ts": row["ts"],
-                "created_event_id": int(row["event_id"]),
-                "active": True,
-            }
-        elif row["type"] == "mission.closed" and mid in state:
-            state[mid]["active"] = False
-    active = [v for v in state.values() if v["active"]]
-    if not active:
+    row = cur.fetchone()
+    if row is None:
         return None
-    active.sort(key=lambda x: x["created_event_id"], reverse=True)
-    return active[0]
+    return {
+        "mission_id": row["mission_id"],
+        "summary": row["summary"],
+        "created_ts": row["ts"],
+        "created_event_id": int(row["event_id"]),
+        "active": True,
+    }
 
 
 def latest_task_for_focus(conn, module_id: str | None) -> dict[str, Any] | None:
@@ -62,7 +63,7 @@ def task_state(conn, task_id: str | None) -> str | None:
         return None
     cur = conn.execute(
         """
-        SELECT payload_json
+        SELECT json_extract(payload_json, '$.new_state') AS new_state
         FROM events
         WHERE type='task.state_changed' AND task_id=?
         ORDER BY event_id DESC
@@ -73,10 +74,7 @@ def task_state(conn, task_id: str | None) -> str | None:
     row = cur.fetchone()
     if not row:
         return None
-    import json
-
-    payload = json.loads(row["payload_json"])
-    return payload.get("new_state")
+    return row["new_state"]
 
 
 def task_workflow(conn, task_id: str | None) -> dict[str, Any] | None:
@@ -99,7 +97,7 @@ def task_workflow(conn, task_id: str | None) -> dict[str, Any] | None:
 
     cur = conn.execute(
         """
-        SELECT payload_json
+        SELECT json_extract(payload_json, '$.new_state') AS new_state
         FROM events
         WHERE type='task.state_changed' AND task_id=?
         ORDER BY event_id DESC
@@ -110,10 +108,7 @@ def task_workflow(conn, task_id: str | None) -> dict[str, Any] | None:
     row = cur.fetchone()
     state = "NEW"
     if row:
-        import json
-
-        payload = json.loads(row["payload_json"])
-        state = payload.get("new_state") or "NEW"
+        state = row["new_state"] or "NEW"
 
     cur = conn.execute(
         """
@@ -179,6 +174,17 @@ def last_incidents(conn, limit: int = 3) -> list[dict[str, Any]]:
     return [dict(r) for r in cur.fetchall()]
 
 
+def incident_count(conn) -> int:
+    cur = conn.execute(
+        """
+        SELECT COUNT(*) AS c
+        FROM events
+        WHERE type LIKE 'incident.%' OR type='incident.logged'
+        """
+    )
+    return int(cur.fetchone()["c"])
+
+
 def last_verify(conn) -> dict[str, Any] | None:
     cur = conn.execute(
         """
@@ -192,8 +198,6 @@ def last_verify(conn) -> dict[str, Any] | None:
     row = cur.fetchone()
     if not row:
         return None
-    import json
-
     payload = json.loads(row["payload_json"])
     return {
         "event_id": row["event_id"],
@@ -35,20 +35,20 @@ def replay_check(conn) -> dict:
         prev_ts = ts
 
     # Scope/module references and artifact references.
+    module_ids = {row["module_id"] for row in conn.execute("SELECT module_id FROM modules").fetchall()}
+    worktree_ids = {row["worktree_id"] for row in conn.execute("SELECT worktree_id FROM worktrees").fetchall()}
+    artifact_ids_known = {row["artifact_id"] for row in conn.execute("SELECT artifact_id FROM artifacts").fetchall()}
+
     cur = conn.execute(
         "SELECT event_id, scope_type, scope_id, worktree_id, artifact_ids_json FROM events ORDER BY event_id"
     )
     for row in cur.fetchall():
         event_id = row["event_id"]
-        if row["scope_type"] == "module":
-            c2 = conn.execute("SELECT 1 FROM modules WHERE module_id=?", (row["scope_id"],))
-            if c2.fetchone() is None:
-                issues.append(f"event {event_id}: module scope_id missing in modules: {row['scope_id']}")
+        if row["scope_type"] == "module" and row["scope_id"] not in module_ids:
+            issues.append(f"event {event_id}: module scope_id missing in modules: {row['scope_id']}")
 
-        if row["worktree_id"]:
-            c2 = conn.execute("SELECT 1 FROM worktrees WHERE worktree_id=?", (row["worktree_id"],))
-            if c2.fetchone() is None:
-                issues.append(f"event {event_id}: worktree_id not found: {row['worktree_id']}")
+        if row["worktree_id"] and row["worktree_id"] not in worktree_ids:
+            issues.append(f"event {event_id}: worktree_id not found: {row['worktree_id']}")
 
         try:
             artifact_ids = json.loads(row["artifact_ids_json"])
@@ -59,15 +59,13 @@ def replay_check(conn) -> dict:
             issues.append(f"event {event_id}: artifact_ids_json must be array")
             continue
         for artifact_id in artifact_ids:
-            c2 = conn.execute("SELECT 1 FROM artifacts WHERE artifact_id=?", (artifact_id,))
-            if c2.fetchone() is None:
+            if artifact_id not in artifact_ids_known:
                 issues.append(f"event {event_id}: artifact_id missing: {artifact_id}")
 
     # Worktree references to modules.
     cur = conn.execute("SELECT worktree_id, module_id FROM worktrees")
     for row in cur.fetchall():
-        c2 = conn.execute("SELECT 1 FROM modules WHERE module_id=?", (row["module_id"],))
-        if c2.fetchone() is None:
+        if row["module_id"] not in module_ids:
             issues.append(f"worktree {row['worktree_id']}: module not found: {row['module_id']}")
 
     return {"ok": len(issues) == 0, "issues": issues}
@@ -5,7 +5,7 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-from pfpkg.projections import event_count, last_incidents, modules_summary
+from pfpkg.projections import event_count, incident_count
 from pfpkg.status import build_status
 
 
@@ -27,7 +27,8 @@ def _tests_gate(conn) -> bool:
 
 def build_manager_report(conn, db_path: Path) -> dict:
     status = build_status(conn, db_path)
-    modules = modules_summary(conn)
+    # build_status already projected modules and the last three incidents.
+    modules = status["modules"]
 
     report = {
         "status": {
@@ -42,14 +43,14 @@ def build_manager_report(conn, db_path: Path) -> dict:
         },
         "counters": {
             "events": event_count(conn),
-            "incidents": len(last_incidents(conn, limit=1000)),
+            "incidents": incident_count(conn),
         },
         "gates": {
             "plan_approved": bool(status.get("plan_approved")),
             "tests_ok": _tests_gate(conn),
             "review_ok": _review_gate(conn),
         },
-        "risks": last_incidents(conn, limit=3),
+        "risks": status["incidents"],
         "next": status["next"],
     }
     return report
@@ -76,7 +76,7 @@ def build_status(conn, db_path: Path) -> dict:
             is_initialized=False,
             active_mission_id=None,
             focus_module=None,
-            plan_approved=False,
+            focus_task=None,
         )
         return {
             "initialized": False,
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 
 from pfpkg.paths import detect_docpack_templates
@@ -29,6 +30,7 @@ SKILL_REL_PATHS = [
 ]
 
 
+@lru_cache(maxsize=1)
 def _local_templates_root() -> Path:
     return Path(__file__).resolve().parent / "templates"
 
@@ -40,6 +42,7 @@ def resolve_templates_root(repo_root: Path) -> Path | None:
     return detect_docpack_templates(repo_root)
 
 
+@lru_cache(maxsize=None)
 def load_template(repo_root: Path, rel_path: str) -> str:
     root = resolve_templates_root(repo_root)
     if root is not None:
@@ -12,6 +12,25 @@ def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+def ensure_ignored_dir(path: Path) -> None:
+    """Create ``path`` with a ``.gitignore`` that keeps its contents out of VCS."""
+    ensure_dir(path)
+    gitignore = path / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("*\n", encoding="utf-8")
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Replace ``path`` in one rename so readers never see a partial file."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def path_to_repo_relative(repo_root: Path, user_path: str) -> Path:
     repo_root_resolved = repo_root.resolve()
     candidate = Path(user_path)
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import os
 import subprocess
 from pathlib import Path
+from typing import Iterator
 
 
 def run_git(repo_root: Path, args: list[str]) -> tuple[int, str, str]:
@@ -18,9 +20,145 @@ def run_git(repo_root: Path, args: list[str]) -> tuple[int, str, str]:
     return proc.returncode, proc.stdout.strip(), proc.stderr.strip()
 
 
-def git_tree_hash(repo_root: Path, rel_path: str) -> tuple[str | None, bool]:
+def path_escapes_repo(rel_path: str) -> bool:
+    """True for absolute paths and ones whose first component is ``..`` (not ``..cache``)."""
+    return os.path.isabs(rel_path) or os.path.normpath(rel_path).split(os.sep)[0] == ".."
+
+
+def git_head_tree(repo_root: Path, rel_path: str) -> str | None:
     code, out, _ = run_git(repo_root, ["rev-parse", f"HEAD:{rel_path}"])
-    tree = out if code == 0 and out else None
-    code2, out2, _ = run_git(repo_root, ["status", "--porcelain", "--", rel_path])
-    dirty = bool(out2) if code2 == 0 else False
-    return tree, dirty
+    return out if code == 0 and out else None
+
+
+def git_head_trees(repo_root: Path, rel_paths: list[str]) -> dict[str, str | None]:
+    """Resolve ``HEAD:<path>`` object ids for many paths with one ``cat-file`` process."""
+    batchable = [p for p in rel_paths if "\n" not in p]
+    out: dict[str, str | None] = {p: git_head_tree(repo_root, p) for p in rel_paths if "\n" in p}
+    if not batchable:
+        return out
+    proc = subprocess.run(
+        ["git", "cat-file", "--batch-check"],
+        cwd=repo_root,
+        input="".join(f"HEAD:{p}\n" for p in batchable),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        # A single rejected path (e.g. outside the repo) aborts the batch; resolve
+        # each path on its own so only that one maps to None.
+        out.update((p, git_head_tree(repo_root, p)) for p in batchable)
+        return out
+    lines = proc.stdout.splitlines()
+    for idx, rel_path in enumerate(batchable):
+        # Found objects print "<oid> <type> <size>"; misses print "<name> missing".
+        parts = lines[idx].split() if idx < len(lines) else []
+        if len(parts) == 3 and parts[1] in {"tree", "blob", "commit"}:
+            out[rel_path] = parts[0]
+        else:
+            # Submodule gitlinks are "missing" here (the commit lives in the
+            # submodule's repo) but rev-parse still returns their oid.
+            out[rel_path] = git_head_tree(repo_root, rel_path)
+    return out
+
+
+def _porcelain_z_paths(raw: str) -> list[str]:
+    records = raw.split("\0")
+    paths: list[str] = []
+    idx = 0
+    while idx < len(records):
+        record = records[idx]
+        idx += 1
+        if len(record) < 4:
+            continue
+        paths.append(record[3:])
+        # Renames/copies carry the original path as an extra NUL-separated field;
+        # the flag is in X for staged renames and in Y for worktree ones (add -N + move).
+        if (record[0] in "RC" or record[1] in "RC") and idx < len(records):
+            paths.append(records[idx])
+            idx += 1
+    return paths
+
+
+# Pathspecs whose matches the prefix check below cannot attribute: globs, magic
+# (":(...)"), absolute and parent-relative paths. These keep git's own matching.
+_NON_LITERAL_CHARS = ("*", "?", "[", "\\")
+# Stay well under the OS argv limit when batching many pathspecs.
+_STATUS_ARGV_BYTES = 64 * 1024
+
+
+def _status_records(repo_root: Path, pathspecs: list[str], *, literal: bool) -> list[str] | None:
+    cmd = ["git", "--literal-pathspecs"] if literal else ["git"]
+    # Not run_git: stripping would eat the leading status column of the first record.
+    try:
+        proc = subprocess.run(
+            [*cmd, "status", "--porcelain=v1", "-uall", "-z", "--", *pathspecs],
+            cwd=repo_root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    if proc.returncode != 0:
+        return None
+    return _porcelain_z_paths(proc.stdout)
+
+
+def _is_literal_pathspec(rel_path: str) -> bool:
+    if rel_path.startswith(":") or Path(rel_path).is_absolute():
+        return False
+    if any(ch in rel_path for ch in _NON_LITERAL_CHARS):
+        return False
+    return ".." not in rel_path.split("/")
+
+
+def _argv_chunks(paths: list[str]) -> Iterator[list[str]]:
+    chunk: list[str] = []
+    size = 0
+    for path in paths:
+        if chunk and size + len(path) + 1 > _STATUS_ARGV_BYTES:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(path)
+        size += len(path) + 1
+    if chunk:
+        yield chunk
+
+
+def _git_path_dirty(repo_root: Path, rel_path: str) -> bool:
+    records = _status_records(repo_root, [rel_path], literal=False)
+    return bool(records)
+
+
+def git_dirty_paths(repo_root: Path, rel_paths: list[str]) -> set[str]:
+    """Return the subset of ``rel_paths`` with uncommitted changes.
+
+    Literal paths share one ``git status`` per argv-sized chunk; anything else,
+    or a chunk git rejects, is checked path by path.
+    """
+    dirty: set[str] = set()
+    literal = [p for p in rel_paths if _is_literal_pathspec(p)]
+    for rel_path in rel_paths:
+        if not _is_literal_pathspec(rel_path) and _git_path_dirty(repo_root, rel_path):
+            dirty.add(rel_path)
+
+    for chunk in _argv_chunks(literal):
+        changed = _status_records(repo_root, chunk, literal=True)
+        if changed is None:
+            dirty.update(p for p in chunk if _git_path_dirty(repo_root, p))
+            continue
+        if not changed:
+            continue
+        for rel_path in chunk:
+            prefix = rel_path.removeprefix("./").strip("/")
+            if prefix in ("", "."):
+                dirty.add(rel_path)
+                continue
+            for path in changed:
+                if path == prefix or path.startswith(prefix + "/"):
+                    dirty.add(rel_path)
+                    break
+    return dirty
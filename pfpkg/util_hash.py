@@ -2,19 +2,114 @@
 
 from __future__ import annotations
 
-import hashlib
+import json
+import os
+import threading
+import time
 from pathlib import Path
 
+from pfpkg.util_fs import atomic_write_text, ensure_ignored_dir
+
+# hashlib is deliberately imported inside the hashing functions.
+
+# Process-wide memo keyed by (path, inode, mtime_ns, ctime_ns, size). ctime is
+# part of the key because cp -p, rsync -a and tar restore mtime but cannot set
+# ctime, so a same-size replacement still changes the key.
+_FILE_SHA256_CACHE: dict[tuple[str, int, int, int, int], str] = {}
+_FILE_SHA256_CACHE_DIRTY = False
+_FILE_SHA256_CACHE_PATH: Path | None = None
+_FILE_SHA256_CACHE_LOADED = False
+# Entries as last read from or written to disk.
+_FILE_SHA256_CACHE_PERSISTED: dict[str, dict[str, object]] = {}
+_FILE_SHA256_CACHE_LOCK = threading.Lock()
+# Entries modified this recently are not persisted: a same-size rewrite within
+# the filesystem timestamp granularity could otherwise reuse a stale digest.
+_RACY_WINDOW_NS = 2_000_000_000
+
 
 def sha256_bytes(data: bytes) -> str:
+    import hashlib
+
     h = hashlib.sha256()
     h.update(data)
     return h.hexdigest()
 
 
+def _sha256_file_uncached(path: Path) -> str:
+    import hashlib
+
+    with path.open("rb", buffering=0) as fh:
+        return hashlib.file_digest(fh, "sha256").hexdigest()
+
+
 def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as fh:
-        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    st = path.stat()
+    key = (str(path), st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size)
+    digest = _FILE_SHA256_CACHE.get(key)
+    if digest is None and not _FILE_SHA256_CACHE_LOADED:
+        _load_persisted_cache()
+        digest = _FILE_SHA256_CACHE.get(key)
+    if digest is None:
+        global _FILE_SHA256_CACHE_DIRTY
+        digest = _sha256_file_uncached(path)
+        _FILE_SHA256_CACHE[key] = digest
+        _FILE_SHA256_CACHE_DIRTY = True
+    return digest
+
+
+def set_sha256_cache_path(cache_path: Path) -> None:
+    """Point the file hash memo at ``cache_path``; it is read on the first miss."""
+    global _FILE_SHA256_CACHE_PATH, _FILE_SHA256_CACHE_LOADED
+    _FILE_SHA256_CACHE_PATH = cache_path
+    _FILE_SHA256_CACHE_LOADED = False
+    _FILE_SHA256_CACHE_PERSISTED.clear()
+
+
+def _load_persisted_cache() -> None:
+    global _FILE_SHA256_CACHE_LOADED
+    with _FILE_SHA256_CACHE_LOCK:
+        if _FILE_SHA256_CACHE_LOADED:
+            return
+        _FILE_SHA256_CACHE_LOADED = True
+        if _FILE_SHA256_CACHE_PATH is None:
+            return
+        # Unreadable caches are ignored.
+        try:
+            raw = json.loads(_FILE_SHA256_CACHE_PATH.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(raw, dict):
+            return
+        for path, entry in raw.items():
+            if not isinstance(entry, dict):
+                continue
+            stamps = (entry.get("i"), entry.get("m"), entry.get("c"), entry.get("s"))
+            digest = entry.get("h")
+            # Entries from older cache layouts lack some stamps and are dropped.
+            if all(isinstance(v, int) for v in stamps) and isinstance(digest, str):
+                ino, mtime_ns, ctime_ns, size = stamps
+                _FILE_SHA256_CACHE.setdefault((path, ino, mtime_ns, ctime_ns, size), digest)
+                _FILE_SHA256_CACHE_PERSISTED[path] = {"i": ino, "m": mtime_ns, "c": ctime_ns, "s": size, "h": digest}
+
+
+def save_sha256_cache(cache_path: Path) -> None:
+    global _FILE_SHA256_CACHE_DIRTY
+    if not _FILE_SHA256_CACHE_DIRTY:
+        return
+    cutoff = time.time_ns() - _RACY_WINDOW_NS
+    entries: dict[str, dict[str, object]] = {}
+    for (path, ino, mtime_ns, ctime_ns, size), digest in _FILE_SHA256_CACHE.items():
+        if max(mtime_ns, ctime_ns) < cutoff:
+            entries[path] = {"i": ino, "m": mtime_ns, "c": ctime_ns, "s": size, "h": digest}
+    # Drop deleted files so the cache tracks the tree instead of growing forever.
+    entries = {path: entry for path, entry in entries.items() if os.path.exists(path)}
+    # New digests inside the racy window are not persisted; skip a write that changes nothing.
+    if entries != _FILE_SHA256_CACHE_PERSISTED or not cache_path.exists():
+        try:
+            ensure_ignored_dir(cache_path.parent)
+            atomic_write_text(cache_path, json.dumps(entries, sort_keys=True))
+        except OSError:
+            return
+        _FILE_SHA256_CACHE_PERSISTED.clear()
+        _FILE_SHA256_CACHE_PERSISTED.update(entries)
+    _FILE_SHA256_CACHE_DIRTY = False
@@ -7,14 +7,17 @@ import re
 from pfpkg.errors import EXIT_VALIDATION, PfError
 
 MODULE_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+_UNSAFE_CHARS_RE = re.compile(r"[^a-z0-9_-]+")
+_DASH_RUN_RE = re.compile(r"-+")
+_LEADING_ALNUM_RE = re.compile(r"[a-z0-9]")
 
 
 def suggest_safe_module_id(value: str) -> str:
-    candidate = re.sub(r"[^a-z0-9_-]+", "-", value.strip().lower())
-    candidate = re.sub(r"-+", "-", candidate).strip("-")
+    candidate = _UNSAFE_CHARS_RE.sub("-", value.strip().lower())
+    candidate = _DASH_RUN_RE.sub("-", candidate).strip("-")
     if not candidate:
         return "module"
-    if not re.match(r"^[a-z0-9]", candidate):
+    if not _LEADING_ALNUM_RE.match(candidate):
         candidate = f"m-{candidate}"
     return candidate[:63]
 
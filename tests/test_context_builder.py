@@ -1,11 +1,62 @@
 from __future__ import annotations
 
 import json
+import os
+import shutil
+import sys
+import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 from tests.common import make_repo, run_pf_json
 
+# Minimal rg stand-in so snippet selection is testable without ripgrep: prints
+# "path:line:text" for lines matching any -e pattern, walking files in name order.
+FAKE_RG = """\
+import os, re, sys
+
+args = sys.argv[1:]
+patterns, roots, max_count = [], [], None
+i = 0
+while i < len(args):
+    arg = args[i]
+    if arg in ("-e", "--max-count", "--color"):
+        if arg == "-e":
+            patterns.append(args[i + 1])
+        elif arg == "--max-count":
+            max_count = int(args[i + 1])
+        i += 2
+    elif arg == "--":
+        roots.extend(args[i + 1 :])
+        break
+    elif arg.startswith("-"):
+        i += 1
+    else:
+        roots.append(arg)
+        i += 1
+regexes = [re.compile(p) for p in patterns]
+found = False
+for root in roots:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            count = 0
+            with open(path, encoding="utf-8", errors="ignore") as fh:
+                for line_no, line in enumerate(fh, start=1):
+                    line = line.rstrip("\\n")
+                    if any(r.search(line) for r in regexes):
+                        print(f"{path}:{line_no}:{line}")
+                        found = True
+                        count += 1
+                        if max_count is not None and count >= max_count:
+                            break
+if os.environ.get("FAKE_RG_DONE"):
+    open(os.environ["FAKE_RG_DONE"], "w").close()
+sys.exit(0 if found else 1)
+"""
+
 
 class ContextBuilderTests(unittest.TestCase):
     def test_context_build_respects_scope_and_budget(self) -> None:
@@ -124,6 +175,8 @@ class ContextBuilderTests(unittest.TestCase):
             self.assertTrue(snippet["path"].startswith("app/allowed/"), snippet["path"])
 
     def test_context_ignores_allowed_paths_outside_repo_with_shared_prefix(self) -> None:
+        if shutil.which("rg") is None:
+            self._use_fake_rg()
         tmp = make_repo()
         self.addCleanup(tmp.cleanup)
         root = Path(tmp.name)
@@ -175,5 +228,68 @@ class ContextBuilderTests(unittest.TestCase):
             self.assertTrue(snippet["path"].startswith("app/"), snippet["path"])
 
 
+    def _use_fake_rg(self) -> None:
+        bin_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(bin_dir.cleanup)
+        rg = Path(bin_dir.name) / "rg"
+        rg.write_text(f"#!{sys.executable}\n{FAKE_RG}", encoding="utf-8")
+        rg.chmod(0o755)
+        patcher = mock.patch.dict(os.environ, {"PATH": f"{bin_dir.name}{os.pathsep}{os.environ.get('PATH', '')}"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _build_snippet_paths(self, files: dict[str, str], query: str) -> list[str]:
+        self._use_fake_rg()
+        tmp = make_repo()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+
+        (root / "app").mkdir(parents=True, exist_ok=True)
+        for name, text in files.items():
+            (root / "app" / name).write_text(text, encoding="utf-8")
+        run_pf_json(root, "init")
+        run_pf_json(root, "module", "upsert", "--module-id", "app", "--root-path", "app", "--display-name", "App")
+        run_pf_json(root, "module", "init", "--module-id", "app", "--write-scaffold")
+        run_pf_json(root, "focus", "module", "app")
+
+        proc, payload = run_pf_json(
+            root, "context", "build", "--intent", "execute", "--module", "app", "--budget", "200000", "--query", query
+        )
+        self.assertEqual(proc.returncode, 0, proc.stdout + proc.stderr)
+        return [snippet["path"] for snippet in payload["data"]["bundle"]["selected"]["code_snippets"]]
+
+    def test_context_counts_rg_hits_per_pattern_and_file(self) -> None:
+        # 40 lines hit both patterns (80 hits); 70 lines hit one, capped at 60 per file.
+        paths = self._build_snippet_paths(
+            {"both.txt": "alpha beta\n" * 40, "many.txt": "alpha\n" * 70},
+            "alpha beta",
+        )
+        self.assertEqual(paths[0], "app/both.txt", paths)
+        self.assertIn("app/many.txt", paths)
+
+    def test_context_hit_limit_keeps_earlier_patterns_first(self) -> None:
+        # 240 alpha hits fill the 200-hit limit before any beta hit is taken.
+        files = {f"m{idx}.txt": "alpha\n" * 60 for idx in range(4)}
+        files["a_beta.txt"] = "beta\n" * 10
+        paths = self._build_snippet_paths(files, "alpha beta")
+        self.assertTrue(paths)
+        self.assertNotIn("app/a_beta.txt", paths)
+
+    def test_context_stops_rg_once_hit_limit_is_reached(self) -> None:
+        marker_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(marker_dir.cleanup)
+        marker = Path(marker_dir.name) / "rg_done"
+        patcher = mock.patch.dict(os.environ, {"FAKE_RG_DONE": str(marker)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # 240 hits arrive before the large file, whose output cannot fit in the pipe.
+        files = {f"a{idx}.txt": "alpha\n" * 60 for idx in range(4)}
+        files["z_big.txt"] = "alpha padding to fill the pipe\n" * 100_000
+        paths = self._build_snippet_paths(files, "alpha")
+        self.assertNotIn("app/z_big.txt", paths)
+        self.assertFalse(marker.exists())
+
+
 if __name__ == "__main__":
     unittest.main()
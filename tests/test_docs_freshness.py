@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import json
+import os
+import subprocess
+import time
 import unittest
 from pathlib import Path
 
@@ -60,6 +64,154 @@ pf_doc:
         self.assertEqual(proc5.returncode, 0, proc5.stdout + proc5.stderr)
         self.assertEqual(payload5["data"]["stale_count"], 1)
 
+    def test_docs_check_uses_persisted_hash_cache_safely(self) -> None:
+        tmp = make_repo()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+
+        (root / "app").mkdir(parents=True, exist_ok=True)
+        src = root / "app" / "api.txt"
+        src.write_text("v1\n", encoding="utf-8")
+        os.utime(src, ns=(1_000_000_000, 1_000_000_000))
+
+        run_pf_json(root, "init")
+        run_pf_json(root, "module", "upsert", "--module-id", "app", "--root-path", "app", "--display-name", "App")
+        run_pf_json(root, "module", "init", "--module-id", "app", "--write-scaffold")
+        (root / ".pf" / "modules" / "app" / "DOCS" / "API.md").write_text(
+            "---\npf_doc:\n  scope: module:app\n  sources:\n    - path: app/api.txt\n      mode: file-sha\n---\n",
+            encoding="utf-8",
+        )
+        # Digests of files changed within the last two seconds are never persisted.
+        time.sleep(2.1)
+
+        proc1, _ = run_pf_json(root, "docs", "scan", "--scope", "module", "--module-id", "app")
+        self.assertEqual(proc1.returncode, 0, proc1.stdout + proc1.stderr)
+        cache_path = root / ".pf" / "cache" / "sha256.json"
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+        self.assertIn(str(src.resolve()), cache)
+        self.assertEqual((cache_path.parent / ".gitignore").read_text(encoding="utf-8"), "*\n")
+        self.assertEqual(list((root / ".pf" / "local").iterdir()), [])
+
+        cache_path.write_text("{not json", encoding="utf-8")
+        proc2, payload2 = run_pf_json(root, "docs", "check", "--scope", "module", "--module-id", "app")
+        self.assertEqual(proc2.returncode, 0, proc2.stdout + proc2.stderr)
+        self.assertEqual(payload2["data"]["stale_count"], 0)
+
+        # Same size and restored mtime, as cp -p or rsync -a would leave it.
+        src.write_text("v2\n", encoding="utf-8")
+        os.utime(src, ns=(1_000_000_000, 1_000_000_000))
+        proc3, payload3 = run_pf_json(root, "docs", "check", "--scope", "module", "--module-id", "app")
+        self.assertEqual(proc3.returncode, 0, proc3.stdout + proc3.stderr)
+        self.assertEqual(payload3["data"]["stale_count"], 1)
+
+    def test_docs_check_batches_git_tree_sources_per_doc(self) -> None:
+        tmp = make_repo()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        (root / ".git").rmdir()
+        subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+
+        for name in ("api", "web", "..cache"):
+            (root / name).mkdir(parents=True, exist_ok=True)
+            (root / name / "main.txt").write_text("v1\n", encoding="utf-8")
+        git = ["git", "-c", "user.name=pf", "-c", "user.email=pf@example.com"]
+        subprocess.run([*git, "add", "api", "web", "..cache"], cwd=root, check=True)
+        subprocess.run([*git, "commit", "-q", "-m", "init"], cwd=root, check=True)
+
+        run_pf_json(root, "init")
+        run_pf_json(root, "module", "upsert", "--module-id", "app", "--root-path", "app", "--display-name", "App")
+        run_pf_json(root, "module", "init", "--module-id", "app", "--write-scaffold")
+        docs_dir = root / ".pf" / "modules" / "app" / "DOCS"
+        for doc, source in (("API.md", "api"), ("WEB.md", "web"), ("DOT.md", "..cache"), ("OUT.md", "../outside")):
+            (docs_dir / doc).write_text(
+                f"---\npf_doc:\n  scope: module:app\n  sources:\n    - path: {source}\n      mode: git-tree\n---\n",
+                encoding="utf-8",
+            )
+
+        proc1, payload1 = run_pf_json(root, "docs", "scan", "--scope", "module", "--module-id", "app")
+        self.assertEqual(proc1.returncode, 0, proc1.stdout + proc1.stderr)
+        self.assertEqual(payload1["data"]["count"], 4)
+
+        (root / "web" / "main.txt").write_text("v2\n", encoding="utf-8")
+        proc2, payload2 = run_pf_json(root, "docs", "check", "--scope", "module", "--module-id", "app")
+        self.assertEqual(proc2.returncode, 0, proc2.stdout + proc2.stderr)
+        stale = [item["path"] for item in payload2["data"]["stale_docs"]]
+        self.assertEqual(stale, [".pf/modules/app/DOCS/WEB.md"])
+
+        (root / "api" / "main.txt").write_text("v2\n", encoding="utf-8")
+        (root / "..cache" / "main.txt").write_text("v2\n", encoding="utf-8")
+        subprocess.run([*git, "commit", "-q", "-am", "api v2"], cwd=root, check=True)
+        proc3, payload3 = run_pf_json(root, "docs", "check", "--scope", "module", "--module-id", "app")
+        self.assertEqual(proc3.returncode, 0, proc3.stdout + proc3.stderr)
+        stale = [item["path"] for item in payload3["data"]["stale_docs"]]
+        self.assertEqual(
+            stale,
+            [".pf/modules/app/DOCS/API.md", ".pf/modules/app/DOCS/DOT.md", ".pf/modules/app/DOCS/WEB.md"],
+        )
+
+    def test_docs_check_sees_worktree_rename_out_of_git_tree_source(self) -> None:
+        tmp = make_repo()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        (root / ".git").rmdir()
+        subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+
+        (root / "zzweb").mkdir(parents=True, exist_ok=True)
+        (root / "zzweb" / "file.txt").write_text("content that survives the move\n", encoding="utf-8")
+        git = ["git", "-c", "user.name=pf", "-c", "user.email=pf@example.com"]
+        subprocess.run([*git, "add", "zzweb"], cwd=root, check=True)
+        subprocess.run([*git, "commit", "-q", "-m", "init"], cwd=root, check=True)
+
+        run_pf_json(root, "init")
+        run_pf_json(root, "module", "upsert", "--module-id", "app", "--root-path", "app", "--display-name", "App")
+        run_pf_json(root, "module", "init", "--module-id", "app", "--write-scaffold")
+        for doc, source in (("WEB.md", "zzweb"), ("NEW.md", "web2.txt")):
+            (root / ".pf" / "modules" / "app" / "DOCS" / doc).write_text(
+                f"---\npf_doc:\n  scope: module:app\n  sources:\n    - path: {source}\n      mode: git-tree\n---\n",
+                encoding="utf-8",
+            )
+        proc1, _ = run_pf_json(root, "docs", "scan", "--scope", "module", "--module-id", "app")
+        self.assertEqual(proc1.returncode, 0, proc1.stdout + proc1.stderr)
+
+        # With both paths in one status call, an intent-to-add move is reported as a
+        # worktree rename (" R new\0old") rather than a deletion under zzweb.
+        (root / "zzweb" / "file.txt").rename(root / "web2.txt")
+        subprocess.run(["git", "add", "-N", "web2.txt"], cwd=root, check=True)
+        proc2, payload2 = run_pf_json(root, "docs", "check", "--scope", "module", "--module-id", "app")
+        self.assertEqual(proc2.returncode, 0, proc2.stdout + proc2.stderr)
+        stale = [item["path"] for item in payload2["data"]["stale_docs"]]
+        self.assertEqual(stale, [".pf/modules/app/DOCS/NEW.md", ".pf/modules/app/DOCS/WEB.md"])
+
+    def test_docs_check_tracks_submodule_gitlink_source(self) -> None:
+        tmp = make_repo()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        (root / ".git").rmdir()
+        subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+
+        git = ["git", "-c", "user.name=pf", "-c", "user.email=pf@example.com"]
+
+        def commit_gitlink(oid: str) -> None:
+            subprocess.run(["git", "update-index", "--add", "--cacheinfo", f"160000,{oid},sub"], cwd=root, check=True)
+            subprocess.run([*git, "commit", "-q", "-m", f"sub {oid[:7]}"], cwd=root, check=True)
+
+        commit_gitlink("1" * 40)
+        run_pf_json(root, "init")
+        run_pf_json(root, "module", "upsert", "--module-id", "app", "--root-path", "app", "--display-name", "App")
+        run_pf_json(root, "module", "init", "--module-id", "app", "--write-scaffold")
+        (root / ".pf" / "modules" / "app" / "DOCS" / "SUB.md").write_text(
+            "---\npf_doc:\n  scope: module:app\n  sources:\n    - path: sub\n      mode: git-tree\n---\n",
+            encoding="utf-8",
+        )
+        proc1, _ = run_pf_json(root, "docs", "scan", "--scope", "module", "--module-id", "app")
+        self.assertEqual(proc1.returncode, 0, proc1.stdout + proc1.stderr)
+
+        commit_gitlink("2" * 40)
+        proc2, payload2 = run_pf_json(root, "docs", "check", "--scope", "module", "--module-id", "app")
+        self.assertEqual(proc2.returncode, 0, proc2.stdout + proc2.stderr)
+        stale = [item["path"] for item in payload2["data"]["stale_docs"]]
+        self.assertEqual(stale, [".pf/modules/app/DOCS/SUB.md"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -19,6 +19,34 @@ class ReportTests(unittest.TestCase):
         self.assertIn("next", report)
         self.assertIn("cmd", report["next"])
 
+    def test_manager_report_counts_incidents(self) -> None:
+        tmp = make_repo()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+
+        run_pf_json(root, "init")
+        for idx in range(2):
+            run_pf_json(
+                root,
+                "event",
+                "append",
+                "--type",
+                "incident.logged",
+                "--scope-type",
+                "root",
+                "--scope-id",
+                "root",
+                "--summary",
+                f"incident {idx}",
+                "--payload-json",
+                "{}",
+            )
+        proc, payload = run_pf_json(root, "report", "manager")
+        self.assertEqual(proc.returncode, 0, proc.stdout + proc.stderr)
+        report = payload["data"]["report"]
+        self.assertEqual(report["counters"]["incidents"], 2)
+        self.assertEqual(len(report["risks"]), 2)
+
 
 if __name__ == "__main__":
     unittest.main()